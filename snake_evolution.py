@@ -1,11 +1,21 @@
+from __future__ import annotations
+
 import pygame
+import numpy as np
 import random
 import json
 import os
+import threading
+from collections import deque
 from enum import Enum
 from dataclasses import dataclass
 from typing import List, Tuple
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain NumPy
+    njit = None
+
 # Initialize Pygame
 pygame.init()
 
@@ -14,8 +24,20 @@ WIDTH, HEIGHT = 800, 600
 GRID_SIZE = 20
 GRID_WIDTH = WIDTH // GRID_SIZE
 GRID_HEIGHT = HEIGHT // GRID_SIZE
+CELL_COUNT = GRID_WIDTH * GRID_HEIGHT
 FPS = 60
 
+# Grid line endpoints; static, drawn once into Game.grid_surface
+GRID_VLINES = [((x, 0), (x, HEIGHT)) for x in range(0, WIDTH, GRID_SIZE)]
+GRID_HLINES = [((0, y), (WIDTH, y)) for y in range(0, HEIGHT, GRID_SIZE)]
+
+# Lookup tables for a head that may have stepped one cell off the grid,
+# indexed by coordinate + 1: the wrapped coordinate, and whether the cell is on the grid
+WRAP_X = [x % GRID_WIDTH for x in range(-1, GRID_WIDTH + 1)]
+WRAP_Y = [y % GRID_HEIGHT for y in range(-1, GRID_HEIGHT + 1)]
+ON_GRID = [[0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT for x in range(-1, GRID_WIDTH + 1)]
+           for y in range(-1, GRID_HEIGHT + 1)]
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -28,18 +50,54 @@ PURPLE = (200, 0, 255)
 ORANGE = (255, 165, 0)
 GRAY = (100, 100, 100)
 
+# Every color a particle can have; particles store an index into this list
+PARTICLE_COLORS = [RED, YELLOW, BLUE, PURPLE, ORANGE]
+PARTICLE_SIZES = range(1, 6)
+PARTICLE_ALPHA_BINS = 8
+
+def cell_bit(pos):
+    # Occupancy maps are ints with one bit per grid cell, row by row
+    return 1 << (pos[1] * GRID_WIDTH + pos[0])
+
 class Direction(Enum):
     UP = (0, -1)
     DOWN = (0, 1)
     LEFT = (-1, 0)
     RIGHT = (1, 0)
 
+KEY_TO_DIRECTION = {
+    pygame.K_UP: Direction.UP, pygame.K_w: Direction.UP,
+    pygame.K_DOWN: Direction.DOWN, pygame.K_s: Direction.DOWN,
+    pygame.K_LEFT: Direction.LEFT, pygame.K_a: Direction.LEFT,
+    pygame.K_RIGHT: Direction.RIGHT, pygame.K_d: Direction.RIGHT,
+}
+
+MENU_KEY_TO_MODE = {
+    pygame.K_1: "CLASSIC",
+    pygame.K_2: "TIME_ATTACK",
+    pygame.K_3: "SURVIVAL",
+}
+
 class PowerUpType(Enum):
     SPEED_BOOST = "Speed Boost"
     SHIELD = "Shield"
     MULTIPLIER = "Score x2"
     GHOST = "Ghost Mode"
 
+# Position of each powerup type in Snake.active_powerups
+POWERUP_INDEX = {powerup_type: i for i, powerup_type in enumerate(PowerUpType)}
+SPEED_BOOST_IDX = POWERUP_INDEX[PowerUpType.SPEED_BOOST]
+SHIELD_IDX = POWERUP_INDEX[PowerUpType.SHIELD]
+MULTIPLIER_IDX = POWERUP_INDEX[PowerUpType.MULTIPLIER]
+GHOST_IDX = POWERUP_INDEX[PowerUpType.GHOST]
+
+POWERUP_COLORS = {
+    PowerUpType.SPEED_BOOST: BLUE,
+    PowerUpType.SHIELD: YELLOW,
+    PowerUpType.MULTIPLIER: PURPLE,
+    PowerUpType.GHOST: ORANGE
+}
+
 @dataclass
 class PowerUp:
     type: PowerUpType
@@ -48,37 +106,99 @@ class PowerUp:
     color: Tuple[int, int, int] = WHITE
     
     def __post_init__(self):
-        colors = {
-            PowerUpType.SPEED_BOOST: BLUE,
-            PowerUpType.SHIELD: YELLOW,
-            PowerUpType.MULTIPLIER: PURPLE,
-            PowerUpType.GHOST: ORANGE
-        }
-        self.color = colors[self.type]
+        self.color = POWERUP_COLORS[self.type]
+
+if njit is not None:
+    # An explicit signature compiles at import instead of on the first burst mid-game
+    @njit("void(float32[:], float32[:], float32[:], float32[:], int16[:], float32[:])",
+          cache=True, fastmath=True)
+    def step_particles(x, y, vx, vy, life, size):
+        for i in range(x.shape[0]):
+            if life[i] > 0:
+                x[i] += vx[i]
+                y[i] += vy[i]
+                life[i] -= 1
+                s = size[i] - 0.1
+                size[i] = 1.0 if s < 1.0 else s
+else:
+    def step_particles(x, y, vx, vy, life, size):
+        x += vx
+        y += vy
+        life -= 1
+        np.maximum(size - 0.1, 1, out=size)
 
-class Particle:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-3, 3)
-        self.vy = random.uniform(-3, 3)
-        self.life = 30
-        self.color = color
-        self.size = random.randint(2, 5)
+class ParticleSystem:
+    """All live particles, stored as one NumPy array per attribute."""
+    LIFE = 30  # frames
+    
+    def __init__(self, atlas):
+        self.atlas = atlas  # (color_idx, size, alpha_bin) -> Surface
+        self.x = np.empty(0, dtype=np.float32)
+        self.y = np.empty(0, dtype=np.float32)
+        self.vx = np.empty(0, dtype=np.float32)
+        self.vy = np.empty(0, dtype=np.float32)
+        self.life = np.empty(0, dtype=np.int16)
+        self.size = np.empty(0, dtype=np.float32)
+        self.color_idx = np.empty(0, dtype=np.int16)
+    
+    def __len__(self):
+        return len(self.life)
+    
+    def emit(self, x, y, color, count):
+        self.x = np.concatenate((self.x, np.full(count, x, dtype=np.float32)))
+        self.y = np.concatenate((self.y, np.full(count, y, dtype=np.float32)))
+        self.vx = np.concatenate((self.vx, np.random.uniform(-3, 3, count).astype(np.float32)))
+        self.vy = np.concatenate((self.vy, np.random.uniform(-3, 3, count).astype(np.float32)))
+        self.life = np.concatenate((self.life, np.full(count, self.LIFE, dtype=np.int16)))
+        self.size = np.concatenate((self.size, np.random.randint(2, 6, count).astype(np.float32)))
+        self.color_idx = np.concatenate((self.color_idx,
+                                         np.full(count, PARTICLE_COLORS.index(color), dtype=np.int16)))
     
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.life -= 1
-        self.size = max(1, self.size - 0.1)
+        if not len(self):
+            return
+        step_particles(self.x, self.y, self.vx, self.vy, self.life, self.size)
+        
+        alive = self.life > 0
+        if not alive.all():
+            self.x = self.x[alive]
+            self.y = self.y[alive]
+            self.vx = self.vx[alive]
+            self.vy = self.vy[alive]
+            self.life = self.life[alive]
+            self.size = self.size[alive]
+            self.color_idx = self.color_idx[alive]
+    
+    @staticmethod
+    def build_atlas():
+        # One pre-drawn circle per color, whole-pixel size and fade level
+        atlas = {}
+        for color_idx, color in enumerate(PARTICLE_COLORS):
+            for size in PARTICLE_SIZES:
+                for alpha_bin in range(PARTICLE_ALPHA_BINS):
+                    alpha = (alpha_bin + 1) * 255 // PARTICLE_ALPHA_BINS
+                    s = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+                    pygame.draw.circle(s, (*color, alpha), (size, size), size)
+                    atlas[color_idx, size, alpha_bin] = s
+        return atlas
     
     def draw(self, screen):
-        if self.life > 0:
-            alpha = int(255 * (self.life / 30))
-            color = (*self.color, alpha)
-            s = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (self.size, self.size), self.size)
-            screen.blit(s, (int(self.x), int(self.y)))
+        atlas = self.atlas
+        sizes = self.size.astype(np.int16)
+        alpha_bins = (self.life - 1) * PARTICLE_ALPHA_BINS // self.LIFE
+        xs = (self.x - sizes).astype(np.int32)
+        ys = (self.y - sizes).astype(np.int32)
+        screen.blits([(atlas[key], pos) for key, pos in
+                      zip(zip(self.color_idx.tolist(), sizes.tolist(), alpha_bins.tolist()),
+                          zip(xs.tolist(), ys.tolist()))], doreturn=False)
+        
+        # Bounding box of everything drawn, for dirty-rect updates
+        if not len(self):
+            return None
+        left, top = int(xs.min()), int(ys.min())
+        right = int((xs + sizes * 2).max())
+        bottom = int((ys + sizes * 2).max())
+        return pygame.Rect(left, top, right - left, bottom - top)
 
 class Obstacle:
     def __init__(self, pos):
@@ -91,10 +211,13 @@ class Snake:
     def reset(self):
         start_x = GRID_WIDTH // 2
         start_y = GRID_HEIGHT // 2
-        self.body = [(start_x, start_y), (start_x - 1, start_y), (start_x - 2, start_y)]
+        self.body = deque([(start_x, start_y), (start_x - 1, start_y), (start_x - 2, start_y)])
+        self.body_bits = 0  # occupancy map of the body, see cell_bit()
+        for segment in self.body:
+            self.body_bits |= cell_bit(segment)
         self.direction = Direction.RIGHT
         self.grow_pending = 0
-        self.active_powerups = {}
+        self.active_powerups = [0] * len(PowerUpType)  # frames left, by POWERUP_INDEX
         
     def get_head(self):
         return self.body[0]
@@ -102,27 +225,31 @@ class Snake:
     def move(self, has_ghost=False):
         head_x, head_y = self.get_head()
         dx, dy = self.direction.value
-        new_head = (head_x + dx, head_y + dy)
+        new_x, new_y = head_x + dx, head_y + dy
         
         # Wall collision with ghost mode
-        if not has_ghost:
-            if (new_head[0] < 0 or new_head[0] >= GRID_WIDTH or 
-                new_head[1] < 0 or new_head[1] >= GRID_HEIGHT):
-                return False
-        else:
+        if has_ghost:
             # Wrap around in ghost mode
-            new_head = (new_head[0] % GRID_WIDTH, new_head[1] % GRID_HEIGHT)
+            new_head = (WRAP_X[new_x + 1], WRAP_Y[new_y + 1])
+        elif ON_GRID[new_y + 1][new_x + 1]:
+            new_head = (new_x, new_y)
+        else:
+            return False
         
-        # Self collision
-        if new_head in self.body[1:]:
+        # Self collision (the tail cell is free unless the snake is growing)
+        head_bit = cell_bit(new_head)
+        if self.body_bits & head_bit and (new_head != self.body[-1] or self.grow_pending > 0):
             return False
         
-        self.body.insert(0, new_head)
+        self.body.appendleft(new_head)
+        self.body_bits |= head_bit
         
         if self.grow_pending > 0:
             self.grow_pending -= 1
         else:
-            self.body.pop()
+            tail = self.body.pop()
+            if tail != new_head:
+                self.body_bits &= ~cell_bit(tail)
         
         return True
     
@@ -147,168 +274,254 @@ class Game:
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 24)
+        self.text_cache = {}  # (text, color, small) -> Surface
+        self.live_text = {}  # slot -> (text, Surface) for text that changes
+        
+        # Pre-render the static grid once; draw_game just blits it
+        self.grid_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.grid_surface.fill(BLACK)
+        for start, end in GRID_VLINES + GRID_HLINES:
+            pygame.draw.line(self.grid_surface, GRAY, start, end)
+        
+        # Pre-render one tile per thing drawn on the grid
+        self.tiles = {
+            "head": self.make_tile(GREEN),
+            "body": self.make_tile(DARK_GREEN),
+            "obstacle": self.make_tile(GRAY),
+            "food": self.make_tile(RED),
+            "ghost_head": self.make_tile(GREEN, alpha=150),
+            "ghost_body": self.make_tile(DARK_GREEN, alpha=150),
+        }
+        
+        # Powerups are their color with a white border
+        self.powerup_tiles = {}
+        for powerup_type, color in POWERUP_COLORS.items():
+            tile = self.make_tile(color)
+            pygame.draw.rect(tile, WHITE, tile.get_rect(), 2)
+            self.powerup_tiles[powerup_type] = tile
+        
+        self.particle_atlas = ParticleSystem.build_atlas()
         
         self.mode = "MENU"  # MENU, CLASSIC, TIME_ATTACK, SURVIVAL, GAME_OVER
+        self.drawn_mode = None  # mode shown by the last full-screen present
+        self.dirty_rects = []  # areas drawn on the previous in-game frame
         self.reset_game()
-        self.high_scores = self.load_high_scores()
-        
+        self.high_scores = None  # loaded on first use, see get_high_scores()
+        self.saved_high_scores = None  # what high_scores.json currently holds
+        self.save_lock = threading.Lock()
+        self.save_thread = None
+        
+    def make_tile(self, color, alpha=None):
+        if alpha is None:
+            tile = pygame.Surface((GRID_SIZE, GRID_SIZE)).convert()
+            tile.fill(color)
+        else:
+            # Match the display's pixel format so alpha blits take the fast path
+            tile = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA).convert_alpha()
+            tile.fill((*color, alpha))
+        return tile
+    
+    def render_text(self, text, color, small=True):
+        key = (text, color, small)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            font = self.small_font if small else self.font
+            surface = font.render(text, True, color)
+            self.text_cache[key] = surface
+        return surface
+    
+    def render_live_text(self, slot, text, color, small=True):
+        # Keeps only the latest rendering per slot, so scores and timers
+        # are re-rendered when they change rather than every frame
+        cached = self.live_text.get(slot)
+        if cached is None or cached[0] != text:
+            font = self.small_font if small else self.font
+            cached = (text, font.render(text, True, color))
+            self.live_text[slot] = cached
+        return cached[1]
+    
     def reset_game(self):
         self.snake = Snake()
         self.score = 0
         self.move_counter = 0
         self.base_speed = 8  # moves per second
         self.speed_multiplier = 1.0
+        self.frames_per_move = 1
+        self.frames_per_move_inputs = None  # inputs frames_per_move was computed from
         self.powerups = []
-        self.particles = []
+        self.particles = ParticleSystem(self.particle_atlas)
         self.obstacles = []
+        self.obstacle_index = {}  # obstacle pos -> index in self.obstacles
+        self.occupied = 0  # occupancy map of food, powerups and obstacles
         self.time_remaining = 60 * FPS  # 60 seconds for time attack
         self.powerup_spawn_counter = 0
         self.food_pos = self.spawn_food()
         
+    def random_free_cell(self):
+        taken = self.occupied | self.snake.body_bits
+        # A few random probes almost always hit a free cell...
+        for _ in range(8):
+            n = random.randrange(CELL_COUNT)
+            if not taken >> n & 1:
+                return (n % GRID_WIDTH, n // GRID_WIDTH)
+        
+        # ...otherwise the board is crowded, so pick among the free bits
+        free = ~taken & ((1 << CELL_COUNT) - 1)
+        if not free:
+            return None
+        free_cells = [n for n, bit in enumerate(reversed(bin(free)[2:])) if bit == "1"]
+        n = random.choice(free_cells)
+        return (n % GRID_WIDTH, n // GRID_WIDTH)
+    
     def spawn_food(self):
-        while True:
-            pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if pos not in self.snake.body and pos not in [o.pos for o in self.obstacles]:
-                return pos
+        pos = self.random_free_cell()
+        if pos is not None:
+            self.occupied |= cell_bit(pos)
+        return pos
     
     def spawn_powerup(self):
         if len(self.powerups) < 2:  # Max 2 powerups on screen
-            while True:
-                pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-                if (pos not in self.snake.body and pos != self.food_pos and 
-                    pos not in [p.pos for p in self.powerups] and
-                    pos not in [o.pos for o in self.obstacles]):
-                    powerup_type = random.choice(list(PowerUpType))
-                    self.powerups.append(PowerUp(powerup_type, pos))
-                    break
+            pos = self.random_free_cell()
+            if pos is not None:
+                powerup_type = random.choice(list(PowerUpType))
+                self.powerups.append(PowerUp(powerup_type, pos))
+                self.occupied |= cell_bit(pos)
     
     def spawn_obstacle(self):
-        while True:
-            pos = (random.randint(0, GRID_WIDTH - 1), random.randint(0, GRID_HEIGHT - 1))
-            if (pos not in self.snake.body and pos != self.food_pos and
-                pos not in [p.pos for p in self.powerups] and
-                pos not in [o.pos for o in self.obstacles]):
-                self.obstacles.append(Obstacle(pos))
-                break
+        pos = self.random_free_cell()
+        if pos is not None:
+            self.obstacle_index[pos] = len(self.obstacles)
+            self.obstacles.append(Obstacle(pos))
+            self.occupied |= cell_bit(pos)
+    
+    def remove_obstacle(self, pos):
+        # Swap the last obstacle into the removed slot, then pop
+        i = self.obstacle_index.pop(pos)
+        last = self.obstacles.pop()
+        if i < len(self.obstacles):
+            self.obstacles[i] = last
+            self.obstacle_index[last.pos] = i
+        self.occupied &= ~cell_bit(pos)
     
     def create_particles(self, x, y, color, count=10):
-        for _ in range(count):
-            self.particles.append(Particle(x * GRID_SIZE + GRID_SIZE // 2, 
-                                          y * GRID_SIZE + GRID_SIZE // 2, color))
+        self.particles.emit(x * GRID_SIZE + GRID_SIZE // 2,
+                            y * GRID_SIZE + GRID_SIZE // 2, color, count)
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type == pygame.VIDEOEXPOSE:
+                self.drawn_mode = None  # window contents were lost, present it all again
+            
             if event.type == pygame.KEYDOWN:
-                if self.mode == "MENU":
-                    if event.key == pygame.K_1:
-                        self.mode = "CLASSIC"
-                        self.reset_game()
-                    elif event.key == pygame.K_2:
-                        self.mode = "TIME_ATTACK"
-                        self.reset_game()
-                    elif event.key == pygame.K_3:
-                        self.mode = "SURVIVAL"
+                key = event.key
+                mode = self.mode
+                if mode == "MENU":
+                    new_mode = MENU_KEY_TO_MODE.get(key)
+                    if new_mode is not None:
+                        self.mode = new_mode
                         self.reset_game()
-                    elif event.key == pygame.K_q:
+                    elif key == pygame.K_q:
                         return False
                 
-                elif self.mode == "GAME_OVER":
-                    if event.key == pygame.K_SPACE:
+                elif mode == "GAME_OVER":
+                    if key == pygame.K_SPACE:
                         self.mode = "MENU"
-                    elif event.key == pygame.K_r:
+                    elif key == pygame.K_r:
                         self.reset_game()
                         self.mode = self.last_mode
                 
                 else:  # In game
-                    if event.key == pygame.K_ESCAPE:
+                    direction = KEY_TO_DIRECTION.get(key)
+                    if direction is not None:
+                        self.snake.set_direction(direction)
+                    elif key == pygame.K_ESCAPE:
                         self.mode = "MENU"
-                    elif event.key == pygame.K_UP or event.key == pygame.K_w:
-                        self.snake.set_direction(Direction.UP)
-                    elif event.key == pygame.K_DOWN or event.key == pygame.K_s:
-                        self.snake.set_direction(Direction.DOWN)
-                    elif event.key == pygame.K_LEFT or event.key == pygame.K_a:
-                        self.snake.set_direction(Direction.LEFT)
-                    elif event.key == pygame.K_RIGHT or event.key == pygame.K_d:
-                        self.snake.set_direction(Direction.RIGHT)
         
         return True
     
     def update(self):
-        if self.mode not in ["CLASSIC", "TIME_ATTACK", "SURVIVAL"]:
+        mode = self.mode
+        if mode not in ["CLASSIC", "TIME_ATTACK", "SURVIVAL"]:
             return
+        snake = self.snake
+        active = snake.active_powerups
         
         # Update particles
-        self.particles = [p for p in self.particles if p.life > 0]
-        for particle in self.particles:
-            particle.update()
+        self.particles.update()
         
         # Update powerup timers
-        expired = []
-        for powerup_type, remaining in self.snake.active_powerups.items():
-            remaining -= 1
-            if remaining <= 0:
-                expired.append(powerup_type)
-            else:
-                self.snake.active_powerups[powerup_type] = remaining
-        
-        for powerup_type in expired:
-            del self.snake.active_powerups[powerup_type]
-        
-        # Calculate current speed
-        current_speed = self.base_speed * self.speed_multiplier
-        if PowerUpType.SPEED_BOOST in self.snake.active_powerups:
-            current_speed *= 1.5
-        
-        # Progressive difficulty in classic mode
-        if self.mode == "CLASSIC":
-            current_speed += len(self.snake.body) * 0.05
+        for i in range(len(active)):
+            if active[i] > 0:
+                active[i] -= 1
+        
+        # Recalculate speed only when the boost or the classic-mode length changes
+        has_speed_boost = active[SPEED_BOOST_IDX] > 0
+        speed_inputs = (has_speed_boost, len(snake.body) if mode == "CLASSIC" else 0)
+        if speed_inputs != self.frames_per_move_inputs:
+            self.frames_per_move_inputs = speed_inputs
+            current_speed = self.base_speed * self.speed_multiplier
+            if has_speed_boost:
+                current_speed *= 1.5
+            
+            # Progressive difficulty in classic mode
+            current_speed += speed_inputs[1] * 0.05
+            self.frames_per_move = max(1, int(FPS / current_speed))
         
         # Move snake at appropriate speed
-        frames_per_move = max(1, int(FPS / current_speed))
         self.move_counter += 1
         
-        if self.move_counter >= frames_per_move:
+        if self.move_counter >= self.frames_per_move:
             self.move_counter = 0
             
             # Move snake
-            has_ghost = PowerUpType.GHOST in self.snake.active_powerups
-            if not self.snake.move(has_ghost):
-                if PowerUpType.SHIELD in self.snake.active_powerups:
+            has_ghost = active[GHOST_IDX] > 0
+            moved = snake.move(has_ghost)
+            head = snake.body[0]
+            if not moved:
+                if active[SHIELD_IDX] > 0:
                     # Shield saves you once
-                    del self.snake.active_powerups[PowerUpType.SHIELD]
-                    self.create_particles(*self.snake.get_head(), YELLOW, 20)
+                    active[SHIELD_IDX] = 0
+                    self.create_particles(*head, YELLOW, 20)
                 else:
                     self.game_over()
                     return
             
             # Check obstacle collision in survival mode
-            if self.mode == "SURVIVAL" and not has_ghost:
-                if self.snake.get_head() in [o.pos for o in self.obstacles]:
-                    if PowerUpType.SHIELD in self.snake.active_powerups:
-                        del self.snake.active_powerups[PowerUpType.SHIELD]
-                        self.obstacles = [o for o in self.obstacles if o.pos != self.snake.get_head()]
-                        self.create_particles(*self.snake.get_head(), YELLOW, 20)
+            if mode == "SURVIVAL" and not has_ghost:
+                if head in self.obstacle_index:
+                    if active[SHIELD_IDX] > 0:
+                        active[SHIELD_IDX] = 0
+                        self.remove_obstacle(head)
+                        self.create_particles(*head, YELLOW, 20)
                     else:
                         self.game_over()
                         return
             
             # Check food collision
-            if self.snake.get_head() == self.food_pos:
-                self.snake.grow(1)
-                multiplier = 2 if PowerUpType.MULTIPLIER in self.snake.active_powerups else 1
+            if head == self.food_pos:
+                snake.grow(1)
+                multiplier = 2 if active[MULTIPLIER_IDX] > 0 else 1
                 self.score += 10 * multiplier
-                self.create_particles(*self.food_pos, RED, 15)
+                self.create_particles(*head, RED, 15)
+                self.occupied &= ~cell_bit(head)
+                self.food_pos = self.spawn_food()
+            elif self.food_pos is None:
+                # The board was full when food last spawned; retry once a cell frees up
                 self.food_pos = self.spawn_food()
             
             # Check powerup collision
-            for powerup in self.powerups[:]:
-                if self.snake.get_head() == powerup.pos:
-                    self.snake.active_powerups[powerup.type] = powerup.duration
-                    self.create_particles(*powerup.pos, powerup.color, 15)
-                    self.powerups.remove(powerup)
+            powerups = self.powerups
+            for i in range(len(powerups) - 1, -1, -1):
+                powerup = powerups[i]
+                if head == powerup.pos:
+                    active[POWERUP_INDEX[powerup.type]] = powerup.duration
+                    self.create_particles(*head, powerup.color, 15)
+                    powerups[i] = powerups[-1]
+                    powerups.pop()
+                    self.occupied &= ~cell_bit(head)
         
         # Spawn powerups periodically
         self.powerup_spawn_counter += 1
@@ -317,12 +530,13 @@ class Game:
             self.spawn_powerup()
         
         # Survival mode: spawn obstacles
-        if self.mode == "SURVIVAL" and len(self.snake.body) % 5 == 0 and len(self.snake.body) > 3:
-            if len(self.obstacles) < len(self.snake.body) // 5:
+        snake_length = len(snake.body)
+        if mode == "SURVIVAL" and snake_length % 5 == 0 and snake_length > 3:
+            if len(self.obstacles) < snake_length // 5:
                 self.spawn_obstacle()
         
         # Time attack mode
-        if self.mode == "TIME_ATTACK":
+        if mode == "TIME_ATTACK":
             self.time_remaining -= 1
             if self.time_remaining <= 0:
                 self.game_over()
@@ -333,24 +547,35 @@ class Game:
         
         # Update high score
         mode_key = self.last_mode.lower()
-        if self.score > self.high_scores.get(mode_key, 0):
+        if self.score > self.get_high_scores().get(mode_key, 0):
             self.high_scores[mode_key] = self.score
             self.save_high_scores()
     
     def draw(self):
-        self.screen.fill(BLACK)
-        
-        if self.mode == "MENU":
-            self.draw_menu()
-        elif self.mode == "GAME_OVER":
-            self.draw_game_over()
+        if self.mode in ("MENU", "GAME_OVER"):
+            # Static screens only need to be drawn once
+            if self.drawn_mode != self.mode:
+                self.screen.fill(BLACK)
+                if self.mode == "MENU":
+                    self.draw_menu()
+                else:
+                    self.draw_game_over()
+                pygame.display.flip()
         else:
-            self.draw_game()
+            # The grid background covers the whole screen, no fill needed
+            dirty_rects = self.draw_game()
+            if self.drawn_mode != self.mode:
+                pygame.display.flip()
+            else:
+                # Present what was drawn now plus what was drawn last frame,
+                # so cells that were vacated get cleared too
+                pygame.display.update(self.dirty_rects + dirty_rects)
+            self.dirty_rects = dirty_rects
         
-        pygame.display.flip()
+        self.drawn_mode = self.mode
     
     def draw_menu(self):
-        title = self.font.render("SNAKE EVOLUTION", True, GREEN)
+        title = self.render_text("SNAKE EVOLUTION", GREEN, small=False)
         self.screen.blit(title, (WIDTH // 2 - title.get_width() // 2, 100))
         
         options = [
@@ -363,32 +588,32 @@ class Game:
         
         y = 200
         for option in options:
-            text = self.small_font.render(option, True, WHITE)
+            text = self.render_text(option, WHITE)
             self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y))
             y += 40
         
         # High scores
         y = 450
-        hs_title = self.small_font.render("HIGH SCORES", True, YELLOW)
+        hs_title = self.render_text("HIGH SCORES", YELLOW)
         self.screen.blit(hs_title, (WIDTH // 2 - hs_title.get_width() // 2, y))
         y += 30
         
         for mode in ["classic", "time_attack", "survival"]:
-            score = self.high_scores.get(mode, 0)
-            text = self.small_font.render(f"{mode.replace('_', ' ').title()}: {score}", True, WHITE)
+            score = self.get_high_scores().get(mode, 0)
+            text = self.render_live_text(mode, f"{mode.replace('_', ' ').title()}: {score}", WHITE)
             self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y))
             y += 25
     
     def draw_game_over(self):
-        game_over_text = self.font.render("GAME OVER", True, RED)
+        game_over_text = self.render_text("GAME OVER", RED, small=False)
         self.screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2, 200))
         
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
+        score_text = self.render_live_text("final_score", f"Score: {self.score}", WHITE, small=False)
         self.screen.blit(score_text, (WIDTH // 2 - score_text.get_width() // 2, 260))
         
         mode_key = self.last_mode.lower()
-        if self.score == self.high_scores.get(mode_key, 0) and self.score > 0:
-            hs_text = self.small_font.render("NEW HIGH SCORE!", True, YELLOW)
+        if self.score == self.get_high_scores().get(mode_key, 0) and self.score > 0:
+            hs_text = self.render_text("NEW HIGH SCORE!", YELLOW)
             self.screen.blit(hs_text, (WIDTH // 2 - hs_text.get_width() // 2, 310))
         
         options = [
@@ -398,79 +623,76 @@ class Game:
         
         y = 380
         for option in options:
-            text = self.small_font.render(option, True, WHITE)
+            text = self.render_text(option, WHITE)
             self.screen.blit(text, (WIDTH // 2 - text.get_width() // 2, y))
             y += 35
     
     def draw_game(self):
+        screen = self.screen
+        blits = screen.blits
+        tiles = self.tiles
+        active = self.snake.active_powerups
+        G = GRID_SIZE
+        
         # Draw grid
-        for x in range(0, WIDTH, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (x, 0), (x, HEIGHT))
-        for y in range(0, HEIGHT, GRID_SIZE):
-            pygame.draw.line(self.screen, GRAY, (0, y), (WIDTH, y))
+        screen.blit(self.grid_surface, (0, 0))
         
         # Draw obstacles
-        for obstacle in self.obstacles:
-            rect = pygame.Rect(obstacle.pos[0] * GRID_SIZE, obstacle.pos[1] * GRID_SIZE, 
-                             GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, GRAY, rect)
+        obstacle_tile = tiles["obstacle"]
+        dirty = blits([(obstacle_tile, (o.pos[0] * G, o.pos[1] * G)) for o in self.obstacles])
         
         # Draw food
-        food_rect = pygame.Rect(self.food_pos[0] * GRID_SIZE, self.food_pos[1] * GRID_SIZE,
-                               GRID_SIZE, GRID_SIZE)
-        pygame.draw.rect(self.screen, RED, food_rect)
+        if self.food_pos is not None:
+            food_x, food_y = self.food_pos
+            dirty.append(screen.blit(tiles["food"], (food_x * G, food_y * G)))
         
         # Draw powerups
-        for powerup in self.powerups:
-            powerup_rect = pygame.Rect(powerup.pos[0] * GRID_SIZE, powerup.pos[1] * GRID_SIZE,
-                                      GRID_SIZE, GRID_SIZE)
-            pygame.draw.rect(self.screen, powerup.color, powerup_rect)
-            pygame.draw.rect(self.screen, WHITE, powerup_rect, 2)
-        
-        # Draw snake
-        for i, segment in enumerate(self.snake.body):
-            color = GREEN if i == 0 else DARK_GREEN
-            
-            # Ghost mode effect
-            if PowerUpType.GHOST in self.snake.active_powerups:
-                s = pygame.Surface((GRID_SIZE, GRID_SIZE), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*color, 150), (0, 0, GRID_SIZE, GRID_SIZE))
-                self.screen.blit(s, (segment[0] * GRID_SIZE, segment[1] * GRID_SIZE))
-            else:
-                segment_rect = pygame.Rect(segment[0] * GRID_SIZE, segment[1] * GRID_SIZE,
-                                         GRID_SIZE, GRID_SIZE)
-                pygame.draw.rect(self.screen, color, segment_rect)
-            
-            # Shield effect on head
-            if i == 0 and PowerUpType.SHIELD in self.snake.active_powerups:
-                pygame.draw.circle(self.screen, YELLOW, 
-                                 (segment[0] * GRID_SIZE + GRID_SIZE // 2,
-                                  segment[1] * GRID_SIZE + GRID_SIZE // 2),
-                                 GRID_SIZE // 2 + 3, 2)
+        powerup_tiles = self.powerup_tiles
+        dirty += blits([(powerup_tiles[p.type], (p.pos[0] * G, p.pos[1] * G)) for p in self.powerups])
+        
+        # Draw snake (translucent in ghost mode)
+        if active[GHOST_IDX] > 0:
+            head_tile, body_tile = tiles["ghost_head"], tiles["ghost_body"]
+        else:
+            head_tile, body_tile = tiles["head"], tiles["body"]
+        dirty += blits([(body_tile if i else head_tile, (x * G, y * G))
+                        for i, (x, y) in enumerate(self.snake.body)])
+        
+        # Shield effect on head
+        if active[SHIELD_IDX] > 0:
+            head_x, head_y = self.snake.body[0]
+            dirty.append(pygame.draw.circle(screen, YELLOW,
+                                            (head_x * G + G // 2, head_y * G + G // 2),
+                                            G // 2 + 3, 2))
         
         # Draw particles
-        for particle in self.particles:
-            particle.draw(self.screen)
+        particles_rect = self.particles.draw(screen)
+        if particles_rect is not None:
+            dirty.append(particles_rect)
         
         # Draw UI
-        score_text = self.small_font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        score_text = self.render_live_text("score", f"Score: {self.score}", WHITE)
+        dirty.append(screen.blit(score_text, (10, 10)))
         
-        mode_text = self.small_font.render(f"Mode: {self.mode}", True, WHITE)
-        self.screen.blit(mode_text, (10, 40))
+        mode_text = self.render_text(f"Mode: {self.mode}", WHITE)
+        dirty.append(screen.blit(mode_text, (10, 40)))
         
         if self.mode == "TIME_ATTACK":
             time_left = max(0, self.time_remaining // FPS)
-            time_text = self.small_font.render(f"Time: {time_left}s", True, WHITE)
-            self.screen.blit(time_text, (10, 70))
+            time_text = self.render_live_text("time", f"Time: {time_left}s", WHITE)
+            dirty.append(screen.blit(time_text, (10, 70)))
         
         # Draw active powerups
         y = HEIGHT - 30
-        for powerup_type, remaining in self.snake.active_powerups.items():
+        for powerup_type, remaining in zip(PowerUpType, active):
+            if remaining <= 0:
+                continue
             time_left = remaining // FPS
-            text = self.small_font.render(f"{powerup_type.value}: {time_left}s", True, WHITE)
-            self.screen.blit(text, (WIDTH - text.get_width() - 10, y))
+            text = self.render_live_text(powerup_type, f"{powerup_type.value}: {time_left}s", WHITE)
+            dirty.append(screen.blit(text, (WIDTH - text.get_width() - 10, y)))
             y -= 25
+        
+        return dirty
     
     def load_high_scores(self):
         try:
@@ -481,12 +703,30 @@ class Game:
             pass
         return {"classic": 0, "time_attack": 0, "survival": 0}
     
+    def get_high_scores(self):
+        # Loading is deferred so startup doesn't wait on the disk
+        if self.high_scores is None:
+            self.high_scores = self.load_high_scores()
+            self.saved_high_scores = dict(self.high_scores)
+        return self.high_scores
+    
     def save_high_scores(self):
-        try:
-            with open("high_scores.json", "w") as f:
-                json.dump(self.high_scores, f, indent=2)
-        except:
-            pass
+        if self.high_scores == self.saved_high_scores:
+            return
+        scores = dict(self.high_scores)
+        self.saved_high_scores = scores
+        # Write in the background so game over doesn't stall on the disk
+        self.save_thread = threading.Thread(target=self.write_high_scores, args=(scores,), daemon=True)
+        self.save_thread.start()
+    
+    def write_high_scores(self, scores):
+        with self.save_lock:
+            try:
+                with open("high_scores.json.tmp", "w") as f:
+                    json.dump(scores, f, indent=2)
+                os.replace("high_scores.json.tmp", "high_scores.json")
+            except:
+                pass
     
     def run(self):
         running = True
@@ -496,6 +736,9 @@ class Game:
             self.draw()
             self.clock.tick(FPS)
         
+        # Don't lose a high score that is still being written
+        if self.save_thread is not None:
+            self.save_thread.join()
         pygame.quit()
 
 if __name__ == "__main__":